@@ -1,8 +1,9 @@
 from __future__ import annotations
-import os
 import jwt  # PyJWT
 
-_secret = os.environ.get("NEXTAUTH_SECRET", "")
+from core.settings import get_settings
+
+_secret = get_settings().nextauth_secret
 
 
 def decode_token(token: str) -> dict:
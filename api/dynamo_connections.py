@@ -3,16 +3,17 @@ DynamoDB connection manager for API Gateway WebSocket.
 Maps connection_id → session_id across Lambda invocations.
 """
 
-import os
 import time
 import logging
 import boto3
 from typing import Optional, Dict, Any
 
+from core.settings import get_settings
+
 logger = logging.getLogger(__name__)
 
-AWS_REGION = os.environ.get("AWS_REGION", "us-west-2")
-CONNECTIONS_TABLE = os.environ.get("CONNECTIONS_TABLE", "eduhive-connections")
+AWS_REGION = get_settings().aws_region
+CONNECTIONS_TABLE = get_settings().connections_table
 
 _table = None
 
@@ -1,29 +1,52 @@
+import hashlib
 import json
-import os
+import logging
 import uuid
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from langchain_core.messages import HumanMessage
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from langchain_core.messages import AIMessageChunk, HumanMessage
 from mangum import Mangum
+import orjson
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
+from starlette.websockets import WebSocketState
 
 from .models import AgentRequest, AgentResponse, UserUpsertRequest
 from .websocket_manager import manager
-from auth.throttling import apply_rate_limit
+from auth.throttling import RateLimitExceeded, apply_rate_limit
+from core.settings import get_settings
 
-load_dotenv()
+settings = get_settings()
+logger = logging.getLogger(__name__)
 
 from core.graph import build_graph  # noqa: E402
 
 db_path = Path(__file__).parent.parent / "memory.db"
-DEPLOYMENT_ENV = os.environ.get("DEPLOYMENT_ENV", "local")
-DATABASE_URL = os.environ.get("DATABASE_URL")
+DEPLOYMENT_ENV = settings.deployment_env
+DATABASE_URL = settings.database_url
+
+
+def _thread_config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def _chunk_text(content) -> str:
+    """Flatten a streamed chunk's content, which may be a list of content blocks."""
+    if isinstance(content, list):
+        return "".join(c.get("text", "") for c in content if isinstance(c, dict))
+    return content
+
+
+async def _send_event(websocket: WebSocket, event: dict) -> None:
+    if websocket.application_state == WebSocketState.DISCONNECTED:
+        # the connection manager closed a stalled peer under us; end the session
+        # the way a client-side disconnect would instead of starlette's RuntimeError
+        raise WebSocketDisconnect(code=1013)
+    await websocket.send_text(orjson.dumps(event).decode())
 
 
 @asynccontextmanager
@@ -51,9 +74,9 @@ async def lifespan(app: FastAPI):
         from langgraph_checkpoint_dynamodb.saver import DynamoDBSaver
 
         checkpointer = DynamoDBSaver(
-            checkpoints_table_name=os.environ.get("CHECKPOINTS_TABLE", "eduhive-checkpoints"),
-            writes_table_name=os.environ.get("WRITES_TABLE", "eduhive-writes"),
-            client_config={"region_name": os.environ.get("AWS_REGION", "us-west-2")},
+            checkpoints_table_name=settings.checkpoints_table,
+            writes_table_name=settings.writes_table,
+            client_config={"region_name": settings.aws_region},
         )
         app.state.graph = build_graph(checkpointer=checkpointer)
         app.state.checkpointer = checkpointer
@@ -61,9 +84,9 @@ async def lifespan(app: FastAPI):
         yield
 
     else:
-        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        from core.checkpoint import PooledSqliteSaver
 
-        async with AsyncSqliteSaver.from_conn_string(str(db_path)) as checkpointer:
+        async with PooledSqliteSaver.from_conn_string(str(db_path)) as checkpointer:
             await checkpointer.setup()
             app.state.graph = build_graph(checkpointer=checkpointer)
             app.state.checkpointer = checkpointer
@@ -71,13 +94,12 @@ async def lifespan(app: FastAPI):
             yield
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 handler = Mangum(app)
 
-_cors_origins = [o.strip() for o in os.environ.get("CORS_ORIGINS", "http://localhost:4000").split(",")]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=_cors_origins,
+    allow_origins=list(settings.cors_origins),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -98,13 +120,13 @@ class JWTMiddleware(BaseHTTPMiddleware):
             return await call_next(request)
         auth = request.headers.get("Authorization", "")
         if not auth.startswith("Bearer "):
-            return JSONResponse({"detail": "Unauthorized"}, status_code=401)
+            return ORJSONResponse({"detail": "Unauthorized"}, status_code=401)
         try:
             from .auth import decode_token
             payload = decode_token(auth.removeprefix("Bearer "))
             request.state.user_sub = payload["sub"]
         except Exception:
-            return JSONResponse({"detail": "Invalid token"}, status_code=401)
+            return ORJSONResponse({"detail": "Invalid token"}, status_code=401)
         return await call_next(request)
 
 
@@ -112,9 +134,16 @@ app.add_middleware(JWTMiddleware)
 app.include_router(ingestion_router)
 
 
+# the landing payload never changes, so render it and its ETag once
+_ROOT_BODY = orjson.dumps({"service": "EduHive API", "docs": "/docs"})
+_ROOT_ETAG = f'"{hashlib.sha256(_ROOT_BODY).hexdigest()[:16]}"'
+
+
 @app.get("/")
-async def root():
-    return {"service": "EduHive API", "docs": "/docs"}
+async def root(request: Request):
+    if request.headers.get("if-none-match") == _ROOT_ETAG:
+        return Response(status_code=304, headers={"ETag": _ROOT_ETAG})
+    return Response(_ROOT_BODY, media_type="application/json", headers={"ETag": _ROOT_ETAG})
 
 
 @app.post("/users/upsert")
@@ -152,10 +181,10 @@ async def health_check():
 
 @app.post("/chat")
 async def chat_endpoint(request: AgentRequest) -> AgentResponse:
+    session_id = request.session_id or str(uuid.uuid4())
     try:
-        session_id = request.session_id or str(uuid.uuid4())
-        apply_rate_limit(session_id)
-        config = {"configurable": {"thread_id": session_id}}
+        await apply_rate_limit(session_id)
+        config = _thread_config(session_id)
         result = await app.state.graph.ainvoke(
             {"messages": [HumanMessage(content=request.prompt)]}, config=config
         )
@@ -165,10 +194,45 @@ async def chat_endpoint(request: AgentRequest) -> AgentResponse:
         return AgentResponse(response=messages[-1].content, session_id=session_id)
     except HTTPException:
         raise
+    except RateLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=e.detail)
     except Exception as e:
+        logger.exception("chat failed for session %s", session_id)
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: AgentRequest) -> StreamingResponse:
+    """Same as /chat, but streams the reply as plain-text tokens as the graph produces them."""
+    session_id = request.session_id or str(uuid.uuid4())
+    try:
+        await apply_rate_limit(session_id)
+    except RateLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=e.detail)
+    config = _thread_config(session_id)
+
+    async def tokens():
+        # the 200 is already on the wire by now, so all that's left to do on failure is log
+        try:
+            # every node is a create_react_agent subgraph; without subgraphs=True the
+            # model's tokens are never surfaced, only each agent's final AIMessage
+            async for _ns, (chunk, _meta) in app.state.graph.astream(
+                {"messages": [HumanMessage(content=request.prompt)]},
+                config=config,
+                stream_mode="messages",
+                subgraphs=True,
+            ):
+                if isinstance(chunk, AIMessageChunk) and chunk.content:
+                    text = _chunk_text(chunk.content)
+                    if text:
+                        yield text
+        except Exception:
+            logger.exception("chat stream failed for session %s", session_id)
+            raise
+
+    return StreamingResponse(tokens(), media_type="text/plain", headers={"X-Session-Id": session_id})
+
+
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(
     websocket: WebSocket,
@@ -184,6 +248,7 @@ async def websocket_endpoint(
             from .auth import decode_token
             user_sub = decode_token(token).get("sub")
         except Exception:
+            manager.disconnect(websocket)
             await websocket.close(code=4001)
             return
 
@@ -194,18 +259,25 @@ async def websocket_endpoint(
 
         owner_sub = await get_study_set_owner_sub(study_set_id)
         if owner_sub and owner_sub != user_sub:
+            manager.disconnect(websocket)
             await websocket.close(code=4003)
             return
 
     from core.progress import register, unregister
     progress_q = register(study_set_id) if study_set_id else None
 
-    await websocket.send_json({"type": "session", "study_set_id": study_set_id, "thread_id": thread_id})
+    await _send_event(websocket, {"type": "session", "study_set_id": study_set_id, "thread_id": thread_id})
+    config = _thread_config(thread_id)
 
     try:
         while True:
             raw = await websocket.receive_text()
-            apply_rate_limit(session_id)
+            try:
+                await apply_rate_limit(session_id)
+            except RateLimitExceeded as e:
+                # HTTPException means nothing on a socket; 1013 = try again later
+                await websocket.close(code=1013, reason=e.detail)
+                break
 
             try:
                 payload = json.loads(raw)
@@ -213,13 +285,12 @@ async def websocket_endpoint(
             except (json.JSONDecodeError, AttributeError):
                 message = raw
 
-            config = {"configurable": {"thread_id": thread_id}}
             invoke_input: dict = {"messages": [HumanMessage(content=message)]}
             if study_set_id:
                 invoke_input["study_set_id"] = study_set_id
 
             # signal that classification_agent is starting
-            await websocket.send_json({"type": "agent_switch", "agent": "classification_agent"})
+            await _send_event(websocket, {"type": "agent_switch", "agent": "classification_agent"})
 
             async for event in app.state.graph.astream_events(invoke_input, config, version="v2"):
                 kind = event["event"]
@@ -227,28 +298,24 @@ async def websocket_endpoint(
                 if kind == "on_chat_model_stream":
                     chunk = event["data"].get("chunk")
                     if chunk and chunk.content:
-                        text = chunk.content
-                        if isinstance(text, list):
-                            text = "".join(
-                                c.get("text", "") for c in text if isinstance(c, dict)
-                            )
+                        text = _chunk_text(chunk.content)
                         if text:
-                            await websocket.send_json({"type": "token", "content": text})
+                            await _send_event(websocket, {"type": "token", "content": text})
 
                 elif kind == "on_tool_start" and event.get("name") == "transfer_to_agent":
                     agent_name = (event["data"].get("input") or {}).get("agent_name", "")
                     if agent_name:
-                        await websocket.send_json({"type": "agent_switch", "agent": agent_name})
+                        await _send_event(websocket, {"type": "agent_switch", "agent": agent_name})
 
                 # drain any queued progress events after each LangGraph event
                 if progress_q:
                     while not progress_q.empty():
-                        await websocket.send_json(progress_q.get_nowait())
+                        await _send_event(websocket, progress_q.get_nowait())
 
             # final drain after stream ends
             if progress_q:
                 while not progress_q.empty():
-                    await websocket.send_json(progress_q.get_nowait())
+                    await _send_event(websocket, progress_q.get_nowait())
 
     except WebSocketDisconnect:
         pass
@@ -5,26 +5,25 @@ Uses DynamoDB for connection mapping and LangGraph checkpointing.
 """
 
 import json
-import os
 import logging
 import asyncio
 import boto3
 from typing import Dict, Any
 
-from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
 from langgraph_checkpoint_dynamodb.saver import DynamoDBSaver
 
 from api.dynamo_connections import save_connection, get_connection, delete_connection
+from core.settings import get_settings
 
-load_dotenv()
+settings = get_settings()
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-AWS_REGION = os.environ.get("AWS_REGION", "us-west-2")
-CHECKPOINTS_TABLE = os.environ.get("CHECKPOINTS_TABLE", "eduhive-checkpoints")
-WRITES_TABLE = os.environ.get("WRITES_TABLE", "eduhive-writes")
+AWS_REGION = settings.aws_region
+CHECKPOINTS_TABLE = settings.checkpoints_table
+WRITES_TABLE = settings.writes_table
 
 # Module-level globals reused across Lambda invocations within same container
 _graph = None
@@ -1,24 +1,81 @@
+import asyncio
+
 from fastapi import WebSocket
 
+# broadcasts a peer may have buffered; past that its oldest pending one is discarded
+QUEUE_SIZE = 32
+# seconds a single frame may sit on a stalled peer before it is dropped
+SEND_TIMEOUT = 0.5
+
 class ConnectionManager:
   def __init__(self):
-    self.active_connections: list[WebSocket] = []
+    # keyed by id(): starlette's WebSocket is a Mapping, so it isn't hashable
+    self.active_connections: dict[int, WebSocket] = {}
+    # outbound queue + relay task per peer, created on the first broadcast that reaches it
+    self._relays: dict[int, tuple[asyncio.Queue, asyncio.Task]] = {}
+    # close() tasks for dropped peers, held so they aren't garbage-collected mid-flight
+    self._closing: set[asyncio.Task] = set()
 
   async def connect(self, websocket: WebSocket):
+    # no TCP_NODELAY here: asyncio (and uvloop) already set it on every accepted TCP
+    # transport, and ASGI doesn't expose the raw socket; dead peers are caught by
+    # uvicorn's WebSocket ping/pong rather than SO_KEEPALIVE
     await websocket.accept()
-    # add a new user to the list of active connections
-    self.active_connections.append(websocket)
+    self.active_connections[id(websocket)] = websocket
 
   def disconnect(self, websocket: WebSocket):
-    self.active_connections.remove(websocket)
-  
+    self.active_connections.pop(id(websocket), None)
+    relay = self._relays.pop(id(websocket), None)
+    if relay:
+      relay[1].cancel()
+
+  async def _relay(self, websocket: WebSocket, queue: asyncio.Queue):
+    try:
+      while True:
+        message = await queue.get()
+        await asyncio.wait_for(websocket.send_text(message), SEND_TIMEOUT)
+    except asyncio.CancelledError:
+      raise
+    except Exception:
+      # the peer went away or stalled mid-send (a timed-out send may have left half a
+      # frame on the wire), so the socket is unusable: stop relaying and close it
+      self._drop(websocket)
+
+  def _drop(self, websocket: WebSocket):
+    # closing makes the endpoint's receive loop see the disconnect, so the client can
+    # reconnect instead of silently missing broadcasts on a socket we've forgotten
+    self.disconnect(websocket)
+    task = asyncio.create_task(self._close(websocket))
+    self._closing.add(task)
+    task.add_done_callback(self._closing.discard)
+
+  @staticmethod
+  async def _close(websocket: WebSocket):
+    try:
+      await websocket.close(code=1013)
+    except Exception:
+      pass  # already closed by the peer or the endpoint
+
   async def send_personal_message(self, message: str, websocket: WebSocket):
     await websocket.send_text(message)
-  
+
   async def broadcast(self, message: str, skip: WebSocket | None = None):
-    for connection in self.active_connections:
+    self._enqueue(message, skip)
+    # give relay tasks a turn so back-to-back broadcasts don't just fill the queues
+    await asyncio.sleep(0)
+
+  def _enqueue(self, message: str, skip: WebSocket | None):
+    for key, connection in list(self.active_connections.items()):
       if connection is skip:
         continue
-      await connection.send_text(message)
+      if key not in self._relays:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._relays[key] = (queue, asyncio.create_task(self._relay(connection, queue)))
+      queue = self._relays[key][0]
+      if queue.full():
+        # a burst outran this relay: shed the oldest message rather than the peer;
+        # peers that are actually stalled are caught by the relay's SEND_TIMEOUT
+        queue.get_nowait()
+      queue.put_nowait(message)
 
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager()
@@ -1,25 +1,39 @@
 import time
-from collections import defaultdict
-from fastapi import HTTPException, status
+from collections import defaultdict, deque
 
 GLOBAL_RATE_LIMIT = 3
 GLOBAL_TIME_WINDOW_SECONDS = 60
 
-user_requests = defaultdict(list)
+user_requests: defaultdict[str, deque] = defaultdict(deque)
 
-def apply_rate_limit(user_id: str):
-    current_time = time.time()
+# the limiter's clock; tests swap this rather than the process-wide time.time
+_now = time.time
+
+
+class RateLimitExceeded(Exception):
+  """Raised when a session has used up its requests for the current window.
+
+  Transport-agnostic: HTTP callers map it to 429, WebSocket callers to close code 1013.
+  """
+  def __init__(self, detail: str = "Too many requests. Please try again later."):
+    super().__init__(detail)
+    self.detail = detail
+
+
+# async so a shared backend (e.g. redis.asyncio) can replace the in-memory store
+# without changing call sites; the in-memory check itself never blocks
+async def apply_rate_limit(user_id: str):
+    current_time = _now()
     rate_limit = GLOBAL_RATE_LIMIT
     time_window = GLOBAL_TIME_WINDOW_SECONDS
 
-    # Filter out requests older than the time window
-    user_requests[user_id] = [t for t in user_requests[user_id] if t > current_time - time_window]
+    # Drop requests older than the time window (oldest are at the left)
+    window = user_requests[user_id]
+    while window and window[0] <= current_time - time_window:
+      window.popleft()
 
-    if len(user_requests[user_id]) >= rate_limit:
-      raise HTTPException(
-        status_code=status.HTTP_429_TOO_MANY_REQUESTS, 
-        detail="Too many requests. Please try again later."
-      )
+    if len(window) >= rate_limit:
+      raise RateLimitExceeded()
 
-    user_requests[user_id].append(current_time)
+    window.append(current_time)
     return True
@@ -0,0 +1,231 @@
+"""SQLite checkpointer helpers for the local (non-Postgres, non-Lambda) deployment."""
+from __future__ import annotations
+import asyncio
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, asynccontextmanager
+
+import aiosqlite
+from langgraph.checkpoint.base import WRITES_IDX_MAP, get_checkpoint_metadata
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+# journal_mode=WAL persists in the db file; the rest are per-connection settings
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",  # 64MB
+)
+
+# default reader pool size; cpu_count() reports host cores, not the container's quota,
+# and every reader is its own thread with a 64MB page cache
+MAX_READERS = 4
+
+# upper bound on puts folded into one BEGIN IMMEDIATE ... COMMIT
+MAX_WRITE_BATCH = 64
+
+_INSERT_CHECKPOINT = (
+    "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+    "type, checkpoint, metadata) VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_WRITES_COLUMNS = "writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value)"
+_UPSERT_WRITES = f"INSERT OR REPLACE INTO {_WRITES_COLUMNS} VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+_INSERT_WRITES = f"INSERT OR IGNORE INTO {_WRITES_COLUMNS} VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+async def apply_pragmas(conn) -> None:
+    """Tune an aiosqlite connection so readers don't block the writer and commits skip the extra fsync."""
+    for pragma in SQLITE_PRAGMAS:
+        await conn.execute(pragma)
+    await conn.commit()
+
+
+class PooledSqliteSaver(AsyncSqliteSaver):
+    """AsyncSqliteSaver with one writer connection and a round-robin pool of read-only connections.
+
+    Writes go through the inherited `self.conn` / `self.lock`; each reader gets its own
+    AsyncSqliteSaver (and lock) so session resumes don't queue behind checkpoint puts.
+    Serializing the (ever-growing) message state happens on `executor`, not the event loop,
+    and puts that queue up while a commit is in flight are group-committed in one transaction.
+    """
+
+    def __init__(self, writer_conn, reader_conns, *, serde=None, executor=None):
+        super().__init__(writer_conn, serde=serde)
+        self.readers = [AsyncSqliteSaver(conn, serde=self.serde) for conn in reader_conns]
+        self._next_reader = itertools.cycle(self.readers)
+        self.executor = executor
+        self._write_queue: asyncio.Queue = asyncio.Queue()
+        self._flusher: asyncio.Task | None = None
+
+    @classmethod
+    @asynccontextmanager
+    async def from_conn_string(cls, conn_string: str, readers: int | None = None):
+        readers = readers or min(os.cpu_count() or 1, MAX_READERS)
+        async with AsyncExitStack() as stack:
+            # a thread pool, not a process pool: shipping the checkpoint to another
+            # process would pickle it, which costs as much as serializing it here
+            executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="checkpoint-serde")
+            stack.callback(executor.shutdown)
+            writer = await stack.enter_async_context(aiosqlite.connect(conn_string))
+            await apply_pragmas(writer)
+            reader_conns = []
+            for _ in range(readers):
+                conn = await stack.enter_async_context(aiosqlite.connect(conn_string))
+                await apply_pragmas(conn)
+                await conn.execute("PRAGMA query_only=1")
+                reader_conns.append(conn)
+            saver = cls(writer, reader_conns, executor=executor)
+            try:
+                yield saver
+            finally:
+                flusher = saver._flusher
+                if flusher:
+                    flusher.cancel()
+                    # let it roll back before the connections close underneath it
+                    await asyncio.gather(flusher, return_exceptions=True)
+
+    async def setup(self) -> None:
+        # the inherited setup() takes the writer lock before checking is_setup, which
+        # would queue every read behind the flusher's transaction
+        if self.is_setup:
+            return
+        await super().setup()
+        # tables are created by the writer; readers are query_only and must not try
+        for reader in self.readers:
+            reader.is_setup = True
+
+    async def aget_tuple(self, config):
+        await self.setup()
+        return await next(self._next_reader).aget_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        await self.setup()
+        reader = next(self._next_reader)
+        async for item in reader.alist(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        await self.setup()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        loop = asyncio.get_running_loop()
+        type_, serialized_checkpoint = await loop.run_in_executor(
+            self.executor, self.serde.dumps_typed, checkpoint
+        )
+        serialized_metadata = self.jsonplus_serde.dumps(get_checkpoint_metadata(config, metadata))
+        await self._write(_INSERT_CHECKPOINT, [(
+            str(thread_id),
+            checkpoint_ns,
+            checkpoint["id"],
+            config["configurable"].get("checkpoint_id"),
+            type_,
+            serialized_checkpoint,
+            serialized_metadata,
+        )])
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        await self.setup()
+        query = _UPSERT_WRITES if all(w[0] in WRITES_IDX_MAP for w in writes) else _INSERT_WRITES
+        loop = asyncio.get_running_loop()
+        serialized = await loop.run_in_executor(
+            self.executor, lambda: [self.serde.dumps_typed(value) for _, value in writes]
+        )
+        await self._write(query, [
+            (
+                str(config["configurable"]["thread_id"]),
+                str(config["configurable"]["checkpoint_ns"]),
+                str(config["configurable"]["checkpoint_id"]),
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                type_,
+                value,
+            )
+            for idx, ((channel, _), (type_, value)) in enumerate(zip(writes, serialized))
+        ])
+
+    async def _write(self, query: str, rows: list[tuple]) -> None:
+        """Queue rows for the flusher and wait until the transaction holding them has committed."""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_writes())
+            self._flusher.add_done_callback(self._flusher_done)
+        done = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((query, rows, done))
+        await done
+
+    def _flusher_done(self, task: asyncio.Task) -> None:
+        # the flusher only stops on shutdown or a bug; don't leave queued puts waiting on it,
+        # and let the next _write start a fresh one
+        self._flusher = None
+        exc = None if task.cancelled() else task.exception()
+        pending = []
+        while not self._write_queue.empty():
+            pending.append(self._write_queue.get_nowait())
+        _settle(pending, exc or asyncio.CancelledError())
+
+    async def _flush_writes(self) -> None:
+        while True:
+            # no artificial delay: whatever piled up during the previous commit rides along
+            batch = [await self._write_queue.get()]
+            while len(batch) < MAX_WRITE_BATCH and not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+            try:
+                await self._commit_batch(batch)
+            except BaseException as e:
+                _settle(batch, e)
+                raise
+
+    async def _commit_batch(self, batch: list[tuple]) -> None:
+        async with self.lock:
+            try:
+                await self._transaction(batch)
+            except Exception:
+                # one bad put must not take other sessions' checkpoints down with it:
+                # retry each on its own and fail only the ones that fail alone
+                for entry in batch:
+                    try:
+                        await self._transaction([entry])
+                    except Exception as e:
+                        _settle([entry], e)
+                    else:
+                        _settle([entry])
+            else:
+                _settle(batch)
+
+    async def _transaction(self, batch: list[tuple]) -> None:
+        if self.conn.in_transaction:
+            # an earlier rollback failed; retry it so this batch doesn't inherit that transaction
+            await self.conn.rollback()
+        await self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for query, rows, _ in batch:
+                await self.conn.executemany(query, rows)
+            await self.conn.commit()
+        except BaseException:
+            try:
+                await self.conn.rollback()
+            except Exception:
+                pass  # the original error is the one worth reporting
+            raise
+
+
+def _settle(batch: list[tuple], exc: BaseException | None = None) -> None:
+    """Resolve the `done` futures of queued writes: success, failure, or cancellation."""
+    for _, _, done in batch:
+        if done.done():
+            continue
+        if exc is None:
+            done.set_result(None)
+        elif isinstance(exc, asyncio.CancelledError):
+            done.cancel()
+        else:
+            done.set_exception(exc)
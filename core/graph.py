@@ -1,19 +1,29 @@
-from dotenv import load_dotenv
+from typing import Literal, get_args
+
 from langchain_core.messages import HumanMessage
 from langgraph.graph import StateGraph, START, END
 
-from core.state import TutorState
-from core.rag import retrieve_context
-from agents.classification_agent import classification_agent
-from agents.feynman_agent import feynman_agent
-from agents.teacher_agent import teacher_agent
-from agents.quiz_agent import quiz_agent
+from core.settings import get_settings
+
+# load .env before the agents below build their chat models at import time
+get_settings()
+
+from core.state import TutorState  # noqa: E402
+from core.rag import retrieve_context  # noqa: E402
+from agents.classification_agent import classification_agent  # noqa: E402
+from agents.feynman_agent import feynman_agent  # noqa: E402
+from agents.teacher_agent import teacher_agent  # noqa: E402
+from agents.quiz_agent import quiz_agent  # noqa: E402
+
 
-load_dotenv()
+AgentName = Literal["quiz_agent", "feynman_agent", "teacher_agent", "classification_agent"]
 
+# identity path map: router_check's return value is the node name, no list scan needed
+_AGENTS: dict[str, str] = {name: name for name in get_args(AgentName)}
 
-def router_check(state: TutorState) -> str:
-    return state.get("current_agent", "classification_agent")
+
+def router_check(state: TutorState) -> AgentName:
+    return state.get("current_agent") or "classification_agent"
 
 
 def _rag_query(state: TutorState) -> str:
@@ -67,13 +77,14 @@ def build_graph(checkpointer=None):
     graph_builder.add_node("teacher_agent", make_rag_node(teacher_agent))
     graph_builder.add_node("quiz_agent", make_rag_node(quiz_agent, inject_quiz=True))
 
-    graph_builder.add_conditional_edges(
-        START,
-        router_check,
-        ["quiz_agent", "feynman_agent", "teacher_agent", "classification_agent"],
-    )
+    graph_builder.add_conditional_edges(START, router_check, _AGENTS)
     graph_builder.add_edge("classification_agent", END)
 
     if checkpointer:
         return graph_builder.compile(checkpointer=checkpointer)
     return graph_builder.compile()
+
+
+def make_graph():
+    """Checkpointer-free graph for `langgraph dev`; the LangGraph server supplies its own persistence."""
+    return build_graph()
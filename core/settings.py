@@ -0,0 +1,34 @@
+"""Process-wide configuration, read from the environment (and .env) once per process."""
+from __future__ import annotations
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+
+@dataclass(frozen=True)
+class Settings:
+    deployment_env: str
+    database_url: str | None
+    cors_origins: tuple[str, ...]
+    aws_region: str
+    checkpoints_table: str
+    writes_table: str
+    connections_table: str
+    nextauth_secret: str
+
+
+@lru_cache
+def get_settings() -> Settings:
+    load_dotenv()
+    return Settings(
+        deployment_env=os.environ.get("DEPLOYMENT_ENV", "local"),
+        database_url=os.environ.get("DATABASE_URL"),
+        cors_origins=tuple(o.strip() for o in os.environ.get("CORS_ORIGINS", "http://localhost:4000").split(",")),
+        aws_region=os.environ.get("AWS_REGION", "us-west-2"),
+        checkpoints_table=os.environ.get("CHECKPOINTS_TABLE", "eduhive-checkpoints"),
+        writes_table=os.environ.get("WRITES_TABLE", "eduhive-writes"),
+        connections_table=os.environ.get("CONNECTIONS_TABLE", "eduhive-connections"),
+        nextauth_secret=os.environ.get("NEXTAUTH_SECRET", ""),
+    )
@@ -1,2 +1,2 @@
-from dotenv import load_dotenv
-load_dotenv()  # load .env before any test module-level code runs
+from core.settings import get_settings
+get_settings()  # load .env before any test module-level code runs
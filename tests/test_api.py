@@ -0,0 +1,137 @@
+"""
+Transport-level tests for api/main.py with a stub graph (no LLM or checkpointer needed).
+Run: uv run pytest tests/test_api.py -v
+"""
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+from starlette.websockets import WebSocketDisconnect
+
+
+class StubGraph:
+    async def ainvoke(self, inputs, config=None):
+        return {"messages": [*inputs["messages"], AIMessage(content="ok")]}
+
+    async def astream_events(self, inputs, config=None, version=None):
+        return
+        yield
+
+    async def astream(self, inputs, config=None, stream_mode=None, subgraphs=False):
+        yield (), (AIMessage(content="ok"), {})
+        raise RuntimeError("graph blew up")
+
+
+def _nested_graph():
+    """An outer graph whose node is a compiled subgraph, like build_graph's create_react_agent nodes."""
+    model = GenericFakeChatModel(messages=iter([AIMessage(content="hello there world")]))
+
+    async def call_model(state: MessagesState):
+        return {"messages": [await model.ainvoke(state["messages"])]}
+
+    inner = StateGraph(MessagesState)
+    inner.add_node("model", call_model)
+    inner.add_edge(START, "model")
+    inner.add_edge("model", END)
+
+    outer = StateGraph(MessagesState)
+    outer.add_node("agent", inner.compile())
+    outer.add_edge(START, "agent")
+    outer.add_edge("agent", END)
+    return outer.compile()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")  # agents build their ChatOpenAI clients at import
+    from fastapi.testclient import TestClient
+    import auth.throttling as throttling
+    from api.main import app
+
+    throttling.user_requests.clear()
+    app.state.graph = StubGraph()
+    # no `with`: skip lifespan so no checkpointer is opened
+    yield TestClient(app)
+    throttling.user_requests.clear()
+
+
+def test_root_serves_etag_and_304(client):
+    resp = client.get("/")
+    assert resp.status_code == 200
+    assert resp.json() == {"service": "EduHive API", "docs": "/docs"}
+    etag = resp.headers["etag"]
+
+    resp = client.get("/", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+    assert resp.content == b""
+
+
+def test_chat_returns_429_after_limit(client):
+    for _ in range(3):
+        resp = client.post("/chat", json={"prompt": "hi", "session_id": "s1"})
+        assert resp.status_code == 200
+        assert resp.json() == {"response": "ok", "session_id": "s1"}
+
+    resp = client.post("/chat", json={"prompt": "hi", "session_id": "s1"})
+    assert resp.status_code == 429
+    assert resp.json()["detail"] == "Too many requests. Please try again later."
+
+
+def test_chat_stream_sends_subgraph_tokens(client):
+    from api.main import app
+
+    app.state.graph = _nested_graph()
+    resp = client.post("/chat/stream", json={"prompt": "hi", "session_id": "s1"})
+    assert resp.status_code == 200
+    assert resp.headers["x-session-id"] == "s1"
+    assert resp.text == "hello there world"
+
+
+def test_chat_stream_logs_graph_failures(client, caplog):
+    with pytest.raises(RuntimeError, match="graph blew up"):
+        client.post("/chat/stream", json={"prompt": "hi", "session_id": "s1"})
+    assert "chat stream failed for session s1" in caplog.text
+
+
+class DroppingGraph(StubGraph):
+    """Has the connection manager drop every peer mid-stream, as a stalled broadcast would."""
+
+    async def astream_events(self, inputs, config=None, version=None):
+        from api.websocket_manager import manager
+
+        for ws in list(manager.active_connections.values()):
+            manager._drop(ws)
+        await asyncio.sleep(0)
+        yield {"event": "on_chat_model_stream", "data": {"chunk": AIMessage(content="late")}}
+
+
+def test_websocket_dropped_by_manager_ends_cleanly(client):
+    from api.main import app
+    from api.websocket_manager import manager
+
+    app.state.graph = DroppingGraph()
+    with client.websocket_connect("/ws/s1") as ws:
+        assert ws.receive_json()["type"] == "session"
+        ws.send_text("hi")
+        assert ws.receive_json()["type"] == "agent_switch"
+        with pytest.raises(WebSocketDisconnect) as exc:
+            ws.receive_json()
+    assert exc.value.code == 1013
+    assert manager.active_connections == {}
+
+
+def test_websocket_closes_with_1013_when_rate_limited(client):
+    with client.websocket_connect("/ws/s1") as ws:
+        assert ws.receive_json()["type"] == "session"
+        for _ in range(3):
+            ws.send_text("hi")
+            assert ws.receive_json() == {"type": "agent_switch", "agent": "classification_agent"}
+
+        ws.send_text("hi")
+        with pytest.raises(WebSocketDisconnect) as exc:
+            ws.receive_json()
+    assert exc.value.code == 1013
+    assert exc.value.reason == "Too many requests. Please try again later."
@@ -0,0 +1,110 @@
+"""
+Tests for the pooled SQLite checkpointer (core/checkpoint.py).
+Run: uv run pytest tests/test_checkpoint.py -v
+"""
+import asyncio
+
+import pytest
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from core.checkpoint import PooledSqliteSaver, _INSERT_CHECKPOINT
+
+
+@pytest.fixture
+async def saver(tmp_path):
+    async with PooledSqliteSaver.from_conn_string(str(tmp_path / "memory.db"), readers=2) as s:
+        await s.setup()
+        yield s
+
+
+def _echo_graph(checkpointer):
+    def echo(state: MessagesState):
+        return {"messages": [("ai", f"echo: {state['messages'][-1].content}")]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("echo", echo)
+    builder.add_edge(START, "echo")
+    builder.add_edge("echo", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _row(checkpoint_id: str) -> tuple:
+    return ("t", "", checkpoint_id, None, "msgpack", b"", b"{}")
+
+
+async def _count_checkpoints(saver) -> int:
+    async with saver.conn.execute("SELECT COUNT(*) FROM checkpoints") as cur:
+        return (await cur.fetchone())[0]
+
+
+async def test_graph_state_round_trips(saver):
+    graph = _echo_graph(saver)
+    config = {"configurable": {"thread_id": "thread-1"}}
+    await graph.ainvoke({"messages": [("user", "hi")]}, config)
+    await graph.ainvoke({"messages": [("user", "again")]}, config)
+
+    state = await graph.aget_state(config)
+    assert [m.content for m in state.values["messages"]] == ["hi", "echo: hi", "again", "echo: again"]
+
+    history = [s async for s in graph.aget_state_history(config)]
+    assert len(history) > 2
+    assert history[0].config["configurable"]["checkpoint_id"] == state.config["configurable"]["checkpoint_id"]
+
+
+async def test_readers_are_query_only(saver):
+    for reader in saver.readers:
+        async with reader.conn.execute("PRAGMA query_only") as cur:
+            assert (await cur.fetchone())[0] == 1
+
+
+async def test_reads_do_not_wait_on_the_writer_lock(saver):
+    graph = _echo_graph(saver)
+    config = {"configurable": {"thread_id": "thread-1"}}
+    await graph.ainvoke({"messages": [("user", "hi")]}, config)
+
+    async with saver.lock:
+        assert await asyncio.wait_for(saver.aget_tuple(config), 1) is not None
+
+        async def history():
+            return [c async for c in saver.alist(config)]
+
+        assert len(await asyncio.wait_for(history(), 1)) > 0
+
+
+async def test_failing_write_does_not_drop_its_batch(saver):
+    results = await asyncio.gather(
+        saver._write(_INSERT_CHECKPOINT, [_row("a")]),
+        saver._write("INSERT INTO no_such_table VALUES (?)", [(1,)]),
+        saver._write(_INSERT_CHECKPOINT, [_row("b")]),
+        return_exceptions=True,
+    )
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], Exception)
+    assert await _count_checkpoints(saver) == 2
+
+
+async def test_failing_rollback_does_not_hang_writers(saver, monkeypatch):
+    async def broken_rollback():
+        monkeypatch.undo()  # fail once, then behave
+        raise RuntimeError("rollback failed")
+
+    monkeypatch.setattr(saver.conn, "rollback", broken_rollback)
+    with pytest.raises(Exception):
+        await asyncio.wait_for(saver._write("INSERT INTO no_such_table VALUES (?)", [(1,)]), 5)
+    await asyncio.wait_for(saver._write(_INSERT_CHECKPOINT, [_row("a")]), 5)
+    assert await _count_checkpoints(saver) == 1
+
+
+async def test_dead_flusher_fails_waiters_and_restarts(saver, monkeypatch):
+    async def crash(batch):
+        raise RuntimeError("flusher bug")
+
+    monkeypatch.setattr(saver, "_commit_batch", crash)
+    with pytest.raises(RuntimeError, match="flusher bug"):
+        await asyncio.wait_for(saver._write(_INSERT_CHECKPOINT, [_row("a")]), 5)
+    await asyncio.sleep(0)  # let the done-callback run
+    assert saver._flusher is None
+
+    monkeypatch.undo()
+    await asyncio.wait_for(saver._write(_INSERT_CHECKPOINT, [_row("b")]), 5)
+    assert await _count_checkpoints(saver) == 1
@@ -0,0 +1,35 @@
+import pytest
+
+import auth.throttling as throttling
+from auth.throttling import GLOBAL_RATE_LIMIT, GLOBAL_TIME_WINDOW_SECONDS, RateLimitExceeded, apply_rate_limit
+
+
+@pytest.fixture(autouse=True)
+def clear_requests():
+    throttling.user_requests.clear()
+    yield
+    throttling.user_requests.clear()
+
+
+async def test_limit_allows_then_rejects():
+    for _ in range(GLOBAL_RATE_LIMIT):
+        assert await apply_rate_limit("s1") is True
+    with pytest.raises(RateLimitExceeded):
+        await apply_rate_limit("s1")
+
+
+async def test_sessions_are_limited_independently():
+    for _ in range(GLOBAL_RATE_LIMIT):
+        await apply_rate_limit("s1")
+    assert await apply_rate_limit("s2") is True
+
+
+async def test_old_requests_are_evicted(monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr(throttling, "_now", lambda: now)
+    for _ in range(GLOBAL_RATE_LIMIT):
+        await apply_rate_limit("s1")
+
+    now += GLOBAL_TIME_WINDOW_SECONDS
+    assert await apply_rate_limit("s1") is True
+    assert len(throttling.user_requests["s1"]) == 1
@@ -0,0 +1,107 @@
+"""
+Tests for the broadcast relay in api/websocket_manager.py, using an in-memory fake socket.
+Run: uv run pytest tests/test_websocket_manager.py -v
+"""
+import asyncio
+
+import pytest
+
+import api.websocket_manager as websocket_manager
+from api.websocket_manager import QUEUE_SIZE, ConnectionManager
+
+
+class FakeWebSocket(dict):
+    """Unhashable like starlette's WebSocket; send_text blocks until `gate` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.sent: list[str] = []
+        self.close_code: int | None = None
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        await self.gate.wait()
+        self.sent.append(message)
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def manager():
+    m = ConnectionManager()
+    yield m
+    for ws in list(m.active_connections.values()):
+        m.disconnect(ws)
+
+
+async def test_connections_are_keyed_by_id_without_a_relay(manager):
+    a, b = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(a)
+    await manager.connect(b)
+    assert manager.active_connections == {id(a): a, id(b): b}
+    assert manager._relays == {}
+
+    manager.disconnect(a)
+    manager.disconnect(a)  # already gone: no-op
+    assert manager.active_connections == {id(b): b}
+
+
+async def test_broadcast_reaches_everyone_but_skip(manager):
+    a, b = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(a)
+    await manager.connect(b)
+    await manager.broadcast("hi", skip=a)
+    await _settle()
+    assert a.sent == [] and b.sent == ["hi"]
+
+
+async def test_disconnect_cancels_the_relay(manager):
+    ws = FakeWebSocket()
+    await manager.connect(ws)
+    await manager.broadcast("hi")
+    _, task = manager._relays[id(ws)]
+
+    manager.disconnect(ws)
+    await _settle()
+    assert task.cancelled()
+    assert manager._relays == {}
+
+
+async def test_full_queue_drops_the_oldest_message(manager, monkeypatch):
+    monkeypatch.setattr(websocket_manager, "SEND_TIMEOUT", 10)
+    ws = FakeWebSocket()
+    ws.gate.clear()
+    await manager.connect(ws)
+
+    await manager.broadcast("m0")  # the relay takes this one and blocks sending it
+    for i in range(1, QUEUE_SIZE + 2):
+        manager._enqueue(f"m{i}", None)
+    ws.gate.set()
+    await _settle()
+
+    assert ws.sent == ["m0", *(f"m{i}" for i in range(2, QUEUE_SIZE + 2))]
+    assert id(ws) in manager.active_connections
+
+
+async def test_stalled_peer_is_closed_with_1013(manager, monkeypatch):
+    monkeypatch.setattr(websocket_manager, "SEND_TIMEOUT", 0.01)
+    ws = FakeWebSocket()
+    ws.gate.clear()
+    await manager.connect(ws)
+
+    await manager.broadcast("hi")
+    await asyncio.sleep(0.05)
+    await _settle()
+
+    assert ws.close_code == 1013
+    assert manager.active_connections == {} and manager._relays == {}